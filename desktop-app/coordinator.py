@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from src.mylib.coordination import CameraCoordinator
+
+
+class SwineCoordinator:
+    def __init__(self, camera_streams, port=8000, notify_url=None, node_timeout=None):
+        # Constants
+        self.HOST, self.PORT = "0.0.0.0", port
+        self.NOTIFY_URL = notify_url or "http://192.168.1.184:5000/notify"
+        self.COOLDOWN_SECONDS = 10
+        self.NODE_TIMEOUT_SECONDS = node_timeout or 6
+        self.LOG_DIRECTORY = "logs"
+
+        # Camera streams handed out to worker nodes, keyed by pen name
+        self.CAMERA_STREAMS = camera_streams
+
+        self.coordinator = CameraCoordinator(self.CAMERA_STREAMS,
+                                             node_timeout=self.NODE_TIMEOUT_SECONDS,
+                                             cooldown_seconds=self.COOLDOWN_SECONDS)
+        self.server = None
+        self.app_running = True
+        self.monitor_thread = None
+
+        # Create directories if they don't exist
+        os.makedirs(self.LOG_DIRECTORY, exist_ok=True)
+
+    def log_message(self, message, save_to_file=True):
+        """Print a timestamped message and optionally save it to a file"""
+        timestamp = time.strftime("%H:%M:%S")
+        log_entry = f"[{timestamp}] {message}"
+        print(log_entry)
+
+        if save_to_file:
+            date_str = time.strftime("%Y-%m-%d")
+            log_file = f"{self.LOG_DIRECTORY}/coordinator_log_{date_str}.txt"
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write(log_entry + "\n")
+
+    def log_assignments(self, reason):
+        """Log the current camera to node assignments"""
+        status = self.coordinator.status()
+        assigned = ", ".join(f"{pen} -> {node}" for pen, node in sorted(status["assignments"].items()))
+        self.log_message(f"{reason}: {assigned or 'no cameras assigned'}")
+        if status["unassigned"]:
+            self.log_message(f"⚠️ Unassigned cameras: {', '.join(status['unassigned'])}")
+
+    def handle_heartbeat(self, data):
+        """Register or refresh a worker node and return its cameras"""
+        node_id = str(data["node_id"])
+        cameras, is_new = self.coordinator.heartbeat(node_id, data.get("capacity", 1), data.get("load", 0.0))
+        if is_new:
+            self.log_message(f"🟢 Node joined: {node_id}")
+            self.log_assignments("Rebalanced")
+        return {"cameras": cameras}
+
+    def handle_leave(self, data):
+        """Remove a worker node that is shutting down"""
+        node_id = str(data["node_id"])
+        if self.coordinator.remove_node(node_id):
+            self.log_message(f"⚫ Node left: {node_id}")
+            self.log_assignments("Rebalanced")
+        return {"ok": True}
+
+    def handle_report(self, data):
+        """Record detection counts from a worker and send deduplicated alerts"""
+        node_id = str(data["node_id"])
+        pen = str(data["pen"])
+        counts = data.get("counts", {})
+        if not isinstance(counts, dict):
+            raise ValueError("counts must be a JSON object")
+        accepted, send_alert = self.coordinator.report(node_id, pen, counts,
+                                                       bool(data.get("alert", False)))
+        if send_alert:
+            self.send_notification(pen, data.get("message", "uncleaned-pig detected"))
+        return {"accepted": accepted}
+
+    def send_notification(self, pen, message):
+        """Send a single notification to ESP32 for an event in a pen"""
+        try:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            payload = {"message": f"{pen}: {message}", "timestamp": timestamp, "pen": pen}
+
+            response = requests.post(self.NOTIFY_URL, json=payload, timeout=5)
+
+            if response.status_code == 200:
+                self.log_message(f"📨 Alert sent: '{payload['message']}'")
+            else:
+                self.log_message(f"⚠️ Alert send failed: HTTP {response.status_code}")
+                self.coordinator.cancel_alert(pen)
+
+        except requests.exceptions.RequestException as e:
+            self.log_message(f"❌ Error sending notification: {str(e)}")
+            self.coordinator.cancel_alert(pen)
+
+    def monitor_loop(self):
+        """Separate thread that drops nodes which stopped sending heartbeats"""
+        while self.app_running:
+            dead = self.coordinator.expire_nodes()
+            if dead:
+                self.log_message(f"❌ Node timed out: {', '.join(dead)}")
+                self.log_assignments("Rebalanced")
+            time.sleep(1)
+
+    def make_handler(self):
+        """Build the HTTP request handler bound to this coordinator"""
+        system = self
+        routes = {
+            "/heartbeat": self.handle_heartbeat,
+            "/leave": self.handle_leave,
+            "/report": self.handle_report,
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            def send_json(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/status":
+                    self.send_json(200, system.coordinator.status())
+                else:
+                    self.send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                route = routes.get(self.path)
+                if route is None:
+                    self.send_json(404, {"error": "not found"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    data = json.loads(self.rfile.read(length) or b"{}")
+                    if not isinstance(data, dict):
+                        raise ValueError("payload must be a JSON object")
+                    self.send_json(200, route(data))
+                except (KeyError, ValueError, TypeError) as e:
+                    self.send_json(400, {"error": str(e)})
+
+            def log_message(self, format, *args):
+                pass  # Keep per-request noise out of the console
+
+        return Handler
+
+    def run(self):
+        """Run the coordinator until interrupted"""
+        self.log_message(f"Coordinator starting on {self.HOST}:{self.PORT} with {len(self.CAMERA_STREAMS)} cameras...")
+        self.server = ThreadingHTTPServer((self.HOST, self.PORT), self.make_handler())
+        self.monitor_thread = threading.Thread(target=self.monitor_loop, daemon=True)
+        self.monitor_thread.start()
+
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.app_running = False
+            self.server.server_close()
+            self.log_message("Coordinator stopped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Swine detection coordinator")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--notify-url", help="URL that receives the alerts")
+    parser.add_argument("--node-timeout", type=float, help="Seconds without a heartbeat before a node is dropped")
+    parser.add_argument("--cameras", default="cameras.json",
+                        help='JSON file mapping pen names to stream URLs, e.g. {"Pen 1": "http://192.168.1.184:81/stream"}')
+    args = parser.parse_args()
+
+    with open(args.cameras, "r", encoding="utf-8") as f:
+        camera_streams = json.load(f)
+    if not isinstance(camera_streams, dict) or not all(isinstance(url, str) for url in camera_streams.values()):
+        raise ValueError(f"'{args.cameras}' must map pen names to stream URLs")
+
+    coordinator = SwineCoordinator(camera_streams, args.port, args.notify_url, args.node_timeout)
+    coordinator.run()
@@ -0,0 +1,207 @@
+# src/mylib/coordination.py
+
+import math
+import threading
+import time
+
+
+def empty_counts() -> dict:
+    """Return a zeroed detection count dictionary."""
+    return {"clean": 0, "uncleaned": 0, "dirt": 0, "total": 0}
+
+
+class CameraCoordinator:
+    """Assign camera streams to worker nodes and aggregate their detections.
+
+    Nodes announce themselves through heartbeats carrying their capacity
+    (max cameras, 0 to drain the node) and load (0.0 - 1.0 busy fraction).
+    The load is divided over the cameras the node was given last time to
+    estimate what one camera costs on that host. Cameras are placed on the
+    least loaded node and spread out again when a node joins, leaves, times
+    out, changes capacity or its load moves by more than load_step.
+    """
+
+    def __init__(self, camera_streams: dict, node_timeout: float = 6.0, cooldown_seconds: float = 10.0,
+                 load_step: float = 0.25):
+        self.camera_streams = dict(camera_streams)  # pen name -> stream url
+        self.node_timeout = node_timeout
+        self.cooldown_seconds = cooldown_seconds
+        self.load_step = load_step
+
+        self.nodes = {}  # node id -> {"capacity", "load", "camera_cost", "running", "last_seen"}
+        self.balanced_load = {}  # node id -> load used at the last rebalance
+        self.assignments = {}  # pen name -> node id
+        self.pen_counts = {pen: empty_counts() for pen in self.camera_streams}
+        self.last_alert_time = {}  # pen name -> timestamp of last alert
+        self.lock = threading.Lock()
+
+    def heartbeat(self, node_id: str, capacity: int = 1, load: float = 0.0, now: float = None) -> tuple:
+        """Register or refresh a node.
+
+        Returns (cameras, is_new) where cameras maps the pens the node should
+        run to their stream urls.
+        """
+        now = time.time() if now is None else now
+        capacity = max(0, int(capacity))
+        load = float(load)
+        if not math.isfinite(load):
+            raise ValueError("load must be a finite number")
+        load = min(1.0, max(0.0, load))
+        with self.lock:
+            previous = self.nodes.get(node_id)
+            # The load was measured over the cameras handed out last time
+            if previous and previous["running"] > 0:
+                camera_cost = load / previous["running"]
+            else:
+                camera_cost = previous["camera_cost"] if previous else None
+            node = {"capacity": capacity, "load": load, "camera_cost": camera_cost, "running": 0,
+                    "last_seen": now}
+            self.nodes[node_id] = node
+            if (previous is None or previous["capacity"] != capacity
+                    or abs(load - self.balanced_load.get(node_id, 0.0)) >= self.load_step):
+                self._rebalance()
+            else:
+                self._assign_orphans()
+            cameras = self._cameras_for(node_id)
+            node["running"] = len(cameras)
+            return cameras, previous is None
+
+    def remove_node(self, node_id: str) -> bool:
+        """Remove a node (graceful leave) and move its cameras elsewhere."""
+        with self.lock:
+            if self.nodes.pop(node_id, None) is None:
+                return False
+            self.balanced_load.pop(node_id, None)
+            self._rebalance()
+            return True
+
+    def expire_nodes(self, now: float = None) -> list:
+        """Drop nodes whose heartbeat is older than the timeout."""
+        now = time.time() if now is None else now
+        with self.lock:
+            dead = [node_id for node_id, node in self.nodes.items()
+                    if now - node["last_seen"] > self.node_timeout]
+            for node_id in dead:
+                del self.nodes[node_id]
+                self.balanced_load.pop(node_id, None)
+            if dead:
+                self._rebalance()
+            return dead
+
+    def report(self, node_id: str, pen: str, counts: dict, alert: bool, now: float = None) -> tuple:
+        """Record a node's detection result for a pen.
+
+        Returns (accepted, send_alert). Reports from a node that no longer
+        owns the pen are ignored, and only the first alert per pen within the
+        cooldown window is passed on so the notifier fires once per event.
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            if self.assignments.get(pen) != node_id:
+                return False, False
+            if node_id in self.nodes:
+                self.nodes[node_id]["last_seen"] = now
+
+            pen_counts = empty_counts()
+            for key in pen_counts:
+                pen_counts[key] = int(counts.get(key, 0))
+            self.pen_counts[pen] = pen_counts
+
+            if not alert or now - self.last_alert_time.get(pen, 0) < self.cooldown_seconds:
+                return True, False
+            self.last_alert_time[pen] = now
+            return True, True
+
+    def cancel_alert(self, pen: str):
+        """Forget the last alert for a pen so the next report may retry it."""
+        with self.lock:
+            self.last_alert_time.pop(pen, None)
+
+    def total_counts(self) -> dict:
+        """Sum the latest counts over every pen."""
+        with self.lock:
+            return self._total_counts()
+
+    def status(self) -> dict:
+        """Return a snapshot of nodes, assignments and counts."""
+        with self.lock:
+            return {
+                "nodes": {node_id: dict(node) for node_id, node in self.nodes.items()},
+                "assignments": dict(self.assignments),
+                "unassigned": [pen for pen in self.camera_streams if pen not in self.assignments],
+                "pen_counts": {pen: dict(counts) for pen, counts in self.pen_counts.items()},
+                "totals": self._total_counts(),
+            }
+
+    def _total_counts(self) -> dict:
+        totals = empty_counts()
+        for counts in self.pen_counts.values():
+            for key in totals:
+                totals[key] += counts[key]
+        return totals
+
+    def _cameras_for(self, node_id: str) -> dict:
+        return {pen: self.camera_streams[pen]
+                for pen, owner in self.assignments.items() if owner == node_id}
+
+    def _assigned_count(self, node_id: str) -> int:
+        return sum(1 for owner in self.assignments.values() if owner == node_id)
+
+    def _camera_cost(self, node_id: str) -> float:
+        """Load one camera adds to a node; unmeasured nodes get the average."""
+        cost = self.nodes[node_id]["camera_cost"]
+        if cost is not None:
+            return cost
+        known = [node["camera_cost"] for node in self.nodes.values() if node["camera_cost"] is not None]
+        return sum(known) / len(known) if known else 0.0
+
+    def _step(self, node_id: str) -> float:
+        """How much one camera adds to the score of a node."""
+        return 1 / self.nodes[node_id]["capacity"] + self._camera_cost(node_id)
+
+    def _score(self, node_id: str) -> float:
+        """Projected load of a node from the cameras it is assigned now."""
+        return self._assigned_count(node_id) * self._step(node_id) if self.nodes[node_id]["capacity"] else 0.0
+
+    def _assign_orphans(self):
+        """Place cameras without a live owner on the least loaded node with room."""
+        for pen in self.camera_streams:
+            if self.assignments.get(pen) in self.nodes:
+                continue
+            self.assignments.pop(pen, None)
+            candidates = [node_id for node_id in self.nodes
+                          if self._assigned_count(node_id) < self.nodes[node_id]["capacity"]]
+            if not candidates:
+                # Nobody is watching this pen, so its last counts are stale
+                self.pen_counts[pen] = empty_counts()
+                continue
+            self.assignments[pen] = min(candidates, key=lambda node_id: (self._score(node_id), node_id))
+
+    def _rebalance(self):
+        """Shed cameras over capacity, reassign orphans, then even out load."""
+        for node_id, node in self.nodes.items():
+            owned = sorted(pen for pen, owner in self.assignments.items() if owner == node_id)
+            for pen in owned[node["capacity"]:]:
+                del self.assignments[pen]
+        self._assign_orphans()
+
+        # Move cameras from the node with the highest projected load to the
+        # lowest one while the receiver ends up strictly below the donor's
+        # current score, so every move improves the balance.
+        while len(self.nodes) > 1:
+            donors = [node_id for node_id in self.nodes if self._assigned_count(node_id) > 0]
+            if not donors:
+                break
+            donor = max(donors, key=lambda node_id: (self._score(node_id), node_id))
+            with_room = [node_id for node_id in self.nodes if node_id != donor
+                         and self._assigned_count(node_id) < self.nodes[node_id]["capacity"]]
+            if not with_room:
+                break
+            receiver = min(with_room, key=lambda node_id: (self._score(node_id), node_id))
+            if self._score(receiver) + self._step(receiver) >= self._score(donor):
+                break
+            pen = max(pen for pen, owner in self.assignments.items() if owner == donor)
+            self.assignments[pen] = receiver
+
+        for node_id, node in self.nodes.items():
+            self.balanced_load[node_id] = node["load"]
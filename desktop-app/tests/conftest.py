@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make `src.mylib` importable the same way main.py imports it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,52 @@
+"""Stand-in worker node that speaks the coordinator protocol without a camera or model.
+
+It heartbeats, reports every assigned pen and sends /leave when "leave" is
+written to its stdin. Killing the process simulates a dead host.
+"""
+import argparse
+import sys
+import threading
+import time
+
+import requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--node-id", required=True)
+    parser.add_argument("--coordinator", required=True)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--load", type=float, default=0.0)
+    parser.add_argument("--alert", action="store_true")
+    parser.add_argument("--uncleaned", type=int, default=1, help="Uncleaned pigs to report per pen")
+    parser.add_argument("--interval", type=float, default=0.2)
+    args = parser.parse_args()
+
+    stopped = threading.Event()
+
+    def heartbeat_loop():
+        while not stopped.is_set():
+            try:
+                reply = requests.post(f"{args.coordinator}/heartbeat", timeout=5, json={
+                    "node_id": args.node_id, "capacity": args.capacity, "load": args.load})
+                for pen in reply.json()["cameras"]:
+                    requests.post(f"{args.coordinator}/report", timeout=5, json={
+                        "node_id": args.node_id, "pen": pen, "alert": args.alert,
+                        "counts": {"uncleaned": args.uncleaned, "total": args.uncleaned}, "message": "uncleaned-pig detected"})
+            except requests.exceptions.RequestException:
+                pass
+            stopped.wait(args.interval)
+
+    thread = threading.Thread(target=heartbeat_loop, daemon=True)
+    thread.start()
+
+    for line in sys.stdin:
+        if line.strip() == "leave":
+            break
+    stopped.set()
+    thread.join()
+    requests.post(f"{args.coordinator}/leave", json={"node_id": args.node_id}, timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import pytest
+
+from src.mylib.coordination import CameraCoordinator
+
+PENS = {f"Pen {i}": f"http://camera/{i}" for i in range(1, 5)}
+
+
+def owned(coordinator, node_id):
+    return sorted(pen for pen, owner in coordinator.assignments.items() if owner == node_id)
+
+
+def test_busy_node_splits_evenly_with_new_node():
+    coordinator = CameraCoordinator(PENS)
+    coordinator.heartbeat("A", capacity=4, load=0.0, now=0)
+    coordinator.heartbeat("A", capacity=4, load=1.0, now=1)
+    assert len(owned(coordinator, "A")) == 4
+
+    coordinator.heartbeat("B", capacity=4, load=0.0, now=2)
+    split = {node_id: owned(coordinator, node_id) for node_id in ("A", "B")}
+    assert [len(pens) for pens in split.values()] == [2, 2]
+
+    # A's next load still covers its four cameras, then both settle at half
+    coordinator.heartbeat("A", capacity=4, load=1.0, now=3)
+    coordinator.heartbeat("B", capacity=4, load=0.5, now=3)
+    coordinator.heartbeat("A", capacity=4, load=0.5, now=4)
+    coordinator.heartbeat("B", capacity=4, load=0.5, now=4)
+    assert {node_id: owned(coordinator, node_id) for node_id in ("A", "B")} == split
+
+
+def test_slow_node_sheds_cameras_to_fast_node():
+    coordinator = CameraCoordinator(PENS)
+    coordinator.heartbeat("A", capacity=4, load=0.0, now=0)
+    coordinator.heartbeat("B", capacity=4, load=0.0, now=0)
+    assert len(owned(coordinator, "A")) == 2
+
+    coordinator.heartbeat("B", capacity=4, load=0.1, now=1)
+    coordinator.heartbeat("A", capacity=4, load=0.9, now=1)
+    assert len(owned(coordinator, "A")) < 2
+
+
+def test_heartbeat_validates_load_and_capacity():
+    coordinator = CameraCoordinator(PENS)
+    with pytest.raises(ValueError):
+        coordinator.heartbeat("A", capacity=4, load=float("inf"), now=0)
+    coordinator.heartbeat("A", capacity=4, load=5, now=0)
+    assert coordinator.nodes["A"]["load"] == 1.0
+
+    cameras, _ = coordinator.heartbeat("A", capacity=0, now=1)
+    assert cameras == {}
+    assert len(coordinator.status()["unassigned"]) == 4
+
+
+def test_lower_capacity_sheds_cameras():
+    coordinator = CameraCoordinator(PENS)
+    cameras, is_new = coordinator.heartbeat("A", capacity=4, now=0)
+    assert is_new and len(cameras) == 4
+
+    cameras, is_new = coordinator.heartbeat("A", capacity=2, now=1)
+    assert not is_new and len(cameras) == 2
+    assert len(coordinator.status()["unassigned"]) == 2
+
+
+def test_unassigned_pens_drop_their_counts():
+    coordinator = CameraCoordinator(PENS, node_timeout=5)
+    coordinator.heartbeat("A", capacity=4, now=0)
+    for pen in PENS:
+        coordinator.report("A", pen, {"uncleaned": 1, "total": 1}, alert=False, now=1)
+    assert coordinator.total_counts()["uncleaned"] == 4
+
+    assert coordinator.expire_nodes(now=10) == ["A"]
+    assert coordinator.total_counts()["uncleaned"] == 0
+
+
+def test_alert_deduplicated_per_pen():
+    coordinator = CameraCoordinator({"Pen 1": "url"}, cooldown_seconds=10)
+    coordinator.heartbeat("A", now=100)
+    assert coordinator.report("A", "Pen 1", {}, alert=True, now=101) == (True, True)
+    coordinator.remove_node("A")
+    coordinator.heartbeat("B", now=102)
+    assert coordinator.report("B", "Pen 1", {}, alert=True, now=103) == (True, False)
+    assert coordinator.report("A", "Pen 1", {}, alert=True, now=104) == (False, False)
+    assert coordinator.report("B", "Pen 1", {}, alert=True, now=112) == (True, True)
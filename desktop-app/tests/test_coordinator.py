@@ -0,0 +1,170 @@
+"""Run coordinator.py with stub worker processes standing in for hosts."""
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+COORDINATOR_SCRIPT = os.path.join(os.path.dirname(TESTS_DIR), "coordinator.py")
+STUB_WORKER_SCRIPT = os.path.join(TESTS_DIR, "stub_worker.py")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(predicate, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            result = predicate()
+            if result:
+                return result
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.1)
+    raise AssertionError("condition not met in time")
+
+
+@pytest.fixture
+def notify_server():
+    """Local stand-in for NOTIFY_URL that records every POST."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/notify", received
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cluster(tmp_path, notify_server):
+    """Start the coordinator and return helpers to add workers and read status."""
+    notify_url, notifications = notify_server
+    processes = []
+
+    def start(pens, node_timeout=6):
+        cameras_file = tmp_path / "cameras.json"
+        cameras_file.write_text(json.dumps({pen: f"http://camera/{pen}" for pen in pens}))
+        port = free_port()
+        processes.append(subprocess.Popen(
+            [sys.executable, COORDINATOR_SCRIPT, "--port", str(port), "--notify-url", notify_url,
+             "--node-timeout", str(node_timeout), "--cameras", str(cameras_file)],
+            cwd=tmp_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        url = f"http://127.0.0.1:{port}"
+        wait_for(lambda: requests.get(f"{url}/status", timeout=1).ok)
+        return url
+
+    def add_worker(url, node_id, *extra):
+        worker = subprocess.Popen(
+            [sys.executable, STUB_WORKER_SCRIPT, "--node-id", node_id, "--coordinator", url, *extra],
+            cwd=tmp_path, stdin=subprocess.PIPE, text=True)
+        processes.append(worker)
+        wait_for(lambda: node_id in status(url)["nodes"])
+        return worker
+
+    def status(url):
+        return requests.get(f"{url}/status", timeout=1).json()
+
+    yield start, add_worker, status, notifications
+
+    for process in processes:
+        process.kill()
+        process.wait()
+
+
+def owners(status):
+    counts = {}
+    for node_id in status["assignments"].values():
+        counts[node_id] = counts.get(node_id, 0) + 1
+    return counts
+
+
+def leave(worker):
+    worker.stdin.write("leave\n")
+    worker.stdin.flush()
+    worker.wait(timeout=10)
+
+
+def test_joining_node_gets_an_even_split(cluster):
+    start, add_worker, status, _ = cluster
+    url = start(["Pen 1", "Pen 2", "Pen 3", "Pen 4"])
+
+    add_worker(url, "A")
+    assert owners(wait_for(lambda: status(url))) == {"A": 4}
+
+    add_worker(url, "B")
+    assert owners(status(url)) == {"A": 2, "B": 2}
+    wait_for(lambda: status(url)["totals"]["uncleaned"] == 4)
+
+
+def test_leaving_node_hands_over_its_cameras(cluster):
+    start, add_worker, status, _ = cluster
+    url = start(["Pen 1", "Pen 2", "Pen 3", "Pen 4"])
+    add_worker(url, "A")
+    worker_b = add_worker(url, "B")
+
+    leave(worker_b)
+    current = status(url)
+    assert "B" not in current["nodes"]
+    assert owners(current) == {"A": 4}
+
+
+def test_timed_out_node_hands_over_its_cameras(cluster):
+    start, add_worker, status, _ = cluster
+    url = start(["Pen 1", "Pen 2", "Pen 3", "Pen 4"], node_timeout=1)
+    add_worker(url, "A")
+    worker_b = add_worker(url, "B")
+    add_worker(url, "C")
+    assert sorted(owners(status(url)).values()) == [1, 1, 2]
+
+    worker_b.kill()
+    current = wait_for(lambda: (lambda s: "B" not in s["nodes"] and s)(status(url)))
+    assert owners(current) == {"A": 2, "C": 2}
+
+
+def test_alert_sent_once_across_owners(cluster):
+    start, add_worker, status, notifications = cluster
+    url = start(["Pen 1"])
+
+    worker_a = add_worker(url, "A", "--alert")
+    wait_for(lambda: len(notifications) == 1)
+    add_worker(url, "B", "--alert", "--uncleaned", "2")
+    leave(worker_a)
+    assert status(url)["assignments"] == {"Pen 1": "B"}
+
+    # B's alert reports are accepted once its counts show up; the alert
+    # decision is made before the reply, so a few more reports settle it
+    wait_for(lambda: status(url)["pen_counts"]["Pen 1"]["uncleaned"] == 2)
+    time.sleep(0.5)
+    assert len(notifications) == 1
+    assert notifications[0]["pen"] == "Pen 1"
+
+
+def test_bad_report_payload_is_rejected(cluster):
+    start, _, _, _ = cluster
+    url = start(["Pen 1"])
+
+    response = requests.post(f"{url}/report", json={"node_id": "A", "pen": "Pen 1", "counts": [1]}, timeout=5)
+    assert response.status_code == 400
+    response = requests.post(f"{url}/heartbeat", json=[1], timeout=5)
+    assert response.status_code == 400
@@ -0,0 +1,226 @@
+import argparse
+import os
+import socket
+import threading
+import time
+
+import cv2
+import requests
+from ultralytics import YOLO
+
+from src.mylib import object_detection
+
+
+class SwineDetectionWorker:
+    def __init__(self, node_id, coordinator_url, capacity, node_timeout=6):
+        # Constants
+        self.NODE_ID = node_id
+        self.COORDINATOR_URL = coordinator_url.rstrip("/")
+        self.CAPACITY = capacity
+        self.MODEL_PATH = "src/utils/best.pt"
+        self.CLASS_FILE = "src/utils/class.names"
+        self.FRAME_WIDTH, self.FRAME_HEIGHT = 960, 720
+        self.CONFIDENCE_THRESHOLD = 0.15
+        self.HEARTBEAT_SECONDS = 2
+        self.NODE_TIMEOUT_SECONDS = node_timeout  # Must match the coordinator's timeout
+        self.REPORT_SECONDS = 1
+        self.RECONNECT_DELAY = 5
+        self.LOG_DIRECTORY = "logs"
+
+        # Global variables
+        self.yolo_model = None
+        self.model_lock = threading.Lock()
+        self.class_names = []
+        self.camera_threads = {}  # pen name -> (stream url, stop event, thread)
+        self.busy_seconds = 0.0
+        self.busy_lock = threading.Lock()
+        self.app_running = True
+
+        # Create directories if they don't exist
+        os.makedirs(self.LOG_DIRECTORY, exist_ok=True)
+
+    def log_message(self, message, save_to_file=True):
+        """Print a timestamped message and optionally save it to a file"""
+        timestamp = time.strftime("%H:%M:%S")
+        log_entry = f"[{timestamp}] [{self.NODE_ID}] {message}"
+        print(log_entry)
+
+        if save_to_file:
+            date_str = time.strftime("%Y-%m-%d")
+            log_file = f"{self.LOG_DIRECTORY}/worker_{self.NODE_ID}_log_{date_str}.txt"
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write(log_entry + "\n")
+
+    def initialize_system(self):
+        """Load the model and class names"""
+        try:
+            if not os.path.exists(self.MODEL_PATH):
+                self.log_message(f"❌ Model not found at {self.MODEL_PATH}")
+                return False
+
+            self.log_message("Loading YOLO model...")
+            self.yolo_model = YOLO(self.MODEL_PATH)
+            self.class_names = object_detection.read_class_names(self.CLASS_FILE)
+            if len(self.class_names) == 0:
+                self.log_message("⚠️ No classes loaded from class file")
+                return False
+
+            self.log_message("✓ Worker initialized successfully")
+            return True
+
+        except Exception as e:
+            self.log_message(f"❌ Error during initialization: {str(e)}")
+            return False
+
+    def post(self, path, payload):
+        """POST a JSON payload to the coordinator and return the JSON reply"""
+        response = requests.post(f"{self.COORDINATOR_URL}{path}", json=payload, timeout=5)
+        response.raise_for_status()
+        return response.json()
+
+    def take_load(self, interval):
+        """Return the fraction of the last interval spent running the model"""
+        with self.busy_lock:
+            busy, self.busy_seconds = self.busy_seconds, 0.0
+        return min(1.0, busy / interval) if interval > 0 else 0.0
+
+    def heartbeat_loop(self):
+        """Report load to the coordinator and follow its camera assignments"""
+        last_beat = time.time()
+        last_success = time.time()
+        while self.app_running:
+            now = time.time()
+            payload = {"node_id": self.NODE_ID, "capacity": self.CAPACITY, "load": self.take_load(now - last_beat)}
+            last_beat = now
+            try:
+                reply = self.post("/heartbeat", payload)
+                self.apply_assignments(reply.get("cameras", {}))
+                last_success = time.time()
+            except requests.exceptions.RequestException as e:
+                self.log_message(f"❌ Coordinator unreachable: {str(e)}")
+                # The coordinator has handed our cameras to other nodes by now,
+                # so stop pulling streams the ESP32 can only serve once
+                if self.camera_threads and time.time() - last_success > self.NODE_TIMEOUT_SECONDS:
+                    self.log_message("⚠️ Lost the coordinator, releasing all cameras")
+                    self.apply_assignments({})
+            time.sleep(self.HEARTBEAT_SECONDS)
+
+    def apply_assignments(self, cameras):
+        """Start and stop camera threads to match the assigned cameras"""
+        for pen, (url, stop_event, thread) in list(self.camera_threads.items()):
+            if cameras.get(pen) != url:
+                self.log_message(f"Releasing {pen}")
+                stop_event.set()
+                del self.camera_threads[pen]
+
+        for pen, url in cameras.items():
+            if pen not in self.camera_threads:
+                self.log_message(f"Taking over {pen} ({url})")
+                stop_event = threading.Event()
+                thread = threading.Thread(target=self.camera_loop, args=(pen, url, stop_event), daemon=True)
+                self.camera_threads[pen] = (url, stop_event, thread)
+                thread.start()
+
+    def process_detection(self, frame):
+        """Run the shared model on a frame and return the class counts"""
+        start = time.time()
+        with self.model_lock:
+            boxes = object_detection.get_prediction_boxes(frame, self.yolo_model, self.CONFIDENCE_THRESHOLD)
+        with self.busy_lock:
+            self.busy_seconds += time.time() - start
+
+        frame, detected_objects, count_cls = object_detection.track_objects(frame, boxes, self.class_names)
+        return count_cls, 'uncleaned-pig' in detected_objects, 'dirt' in detected_objects
+
+    def camera_loop(self, pen, url, stop_event):
+        """Separate thread running detection on one assigned camera"""
+        capture = None
+        last_report = 0
+        uncleaned_pending = False
+        dirt_pending = False
+
+        while self.app_running and not stop_event.is_set():
+            if capture is None or not capture.isOpened():
+                try:
+                    capture = object_detection.load_camera(url)
+                    self.log_message(f"✓ Connected to {pen}")
+                except Exception as e:
+                    self.log_message(f"❌ Camera connection error for {pen}: {str(e)}")
+                    capture = None
+                    stop_event.wait(self.RECONNECT_DELAY)
+                    continue
+
+            try:
+                ret, frame = capture.read()
+                if not ret or frame is None:
+                    self.log_message(f"⚠️ Empty frame received from {pen}")
+                    capture.release()
+                    capture = None
+                    continue
+
+                frame = cv2.resize(frame, (self.FRAME_WIDTH, self.FRAME_HEIGHT))
+                count_cls, uncleaned_found, dirt_found = self.process_detection(frame)
+                uncleaned_pending = uncleaned_pending or uncleaned_found
+                dirt_pending = dirt_pending or dirt_found
+
+                if time.time() - last_report >= self.REPORT_SECONDS:
+                    payload = {"node_id": self.NODE_ID, "pen": pen, "counts": count_cls,
+                               "alert": uncleaned_pending or dirt_pending}
+                    if uncleaned_pending and dirt_pending:
+                        payload["message"] = "dirt and uncleaned-pig detected"
+                    elif dirt_pending:
+                        payload["message"] = "dirt detected"
+                    elif uncleaned_pending:
+                        payload["message"] = "uncleaned-pig detected"
+                    self.post("/report", payload)
+                    last_report = time.time()
+                    uncleaned_pending = False
+                    dirt_pending = False
+
+            except requests.exceptions.RequestException as e:
+                self.log_message(f"❌ Error reporting {pen}: {str(e)}")
+                last_report = time.time()
+            except Exception as e:
+                self.log_message(f"❌ Error in detection loop for {pen}: {str(e)}")
+                time.sleep(0.1)
+
+        if capture is not None:
+            capture.release()
+
+    def on_closing(self):
+        """Stop camera threads and tell the coordinator this node is leaving"""
+        self.app_running = False
+        for url, stop_event, thread in self.camera_threads.values():
+            stop_event.set()
+            thread.join(timeout=1.0)
+        try:
+            self.post("/leave", {"node_id": self.NODE_ID})
+        except requests.exceptions.RequestException:
+            pass
+        self.log_message("Worker stopped")
+
+    def run(self):
+        """Run the worker until interrupted"""
+        if not self.initialize_system():
+            self.log_message("⚠️ Worker initialization failed. Please check your settings and try again.")
+            return
+
+        self.log_message(f"Joining coordinator at {self.COORDINATOR_URL}...")
+        try:
+            self.heartbeat_loop()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.on_closing()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Swine detection worker node")
+    parser.add_argument("--node-id", default=socket.gethostname())
+    parser.add_argument("--coordinator", default="http://127.0.0.1:8000")
+    parser.add_argument("--capacity", type=int, default=2, help="Maximum number of cameras to run")
+    parser.add_argument("--node-timeout", type=float, default=6,
+                        help="Seconds without a heartbeat before the coordinator drops this node")
+    args = parser.parse_args()
+
+    worker = SwineDetectionWorker(args.node_id, args.coordinator, args.capacity, args.node_timeout)
+    worker.run()